@@ -1,10 +1,20 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import plotly.express as px
+from st_aggrid import AgGrid, GridOptionsBuilder
+import hashlib
+import json
+import os
+import time
+from contextlib import suppress
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from tempfile import NamedTemporaryFile
+from tempfile import gettempdir, mkstemp
 
 # Set Streamlit page configuration
 st.set_page_config(page_title="Reinsurance Dashboard", layout="wide")
@@ -14,12 +24,211 @@ REQUIRED_COLUMNS = [
     "Year", "Claim Count", "Risk Category", "Premium Collected"
 ]
 
+SNAPSHOT_DIR = os.path.join(gettempdir(), "reins_snapshots")
+# Bump whenever parsing or dtype conversion changes so older snapshots are ignored
+SNAPSHOT_VERSION = 5
+# Uploads may be confidential, so snapshots are deleted a day after they are written
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+# Distinct uploads held in memory across all sessions; sessions on the same file share one entry
+SHARED_FRAME_LIMIT = 8
+SHARED_FRAME_TTL = 12 * 60 * 60
+
+
+def _upload_key(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _snapshot_dir_ok() -> bool:
+    # Only trust a private directory this process owns
+    try:
+        os.makedirs(SNAPSHOT_DIR, mode=0o700, exist_ok=True)
+        info = os.stat(SNAPSHOT_DIR)
+    except OSError:
+        return False
+    return not hasattr(os, "getuid") or (info.st_uid == os.getuid() and info.st_mode & 0o077 == 0)
+
+
+def _prune_snapshots():
+    cutoff = time.time() - SNAPSHOT_MAX_AGE
+    for entry in os.scandir(SNAPSHOT_DIR):
+        with suppress(OSError):
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+
+
+def _read_snapshot(path):
+    if not _snapshot_dir_ok():
+        return None
+    try:
+        # Prune first so an expired snapshot is deleted rather than served
+        _prune_snapshots()
+        if not os.path.exists(path):
+            return None
+        return pd.read_parquet(path)
+    except Exception:
+        return None
+
+
+def _write_snapshot(df, path):
+    # Best effort: a failed snapshot must never fail the upload
+    tmp_path = None
+    try:
+        if not _snapshot_dir_ok():
+            return
+        _prune_snapshots()
+        # A unique temp file per writer, so concurrent uploads of the same bytes can't interleave
+        fd, tmp_path = mkstemp(dir=SNAPSHOT_DIR, suffix=".tmp")
+        os.close(fd)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if tmp_path is not None:
+            with suppress(OSError):
+                os.remove(tmp_path)
+
+
+# Shared by every session without copying, so callers must never mutate the returned frame
+@st.cache_resource(max_entries=SHARED_FRAME_LIMIT, ttl=SHARED_FRAME_TTL, show_spinner=False)
+def _shared_frame(df_key, _df=None):
+    # Exceptions aren't cached, so a lookup after eviction raises instead of storing None
+    if _df is None:
+        raise KeyError(df_key)
+    return _df
+
+
+@st.cache_data(max_entries=SHARED_FRAME_LIMIT, show_spinner=False)
+def _parse_upload(name: str, data: bytes) -> pd.DataFrame:
+    # Keyed on the raw bytes so reruns and repeat uploads skip the parser
+    snapshot = os.path.join(SNAPSHOT_DIR, f"reins_v{SNAPSHOT_VERSION}_{_upload_key(data)}.parquet")
+    df = _read_snapshot(snapshot)
+    if df is not None:
+        return df
+
+    if name.endswith(".csv"):
+        # Arrow's multithreaded reader; dimensions arrive dictionary-encoded, i.e. already categorical
+        dimension = pa.dictionary(pa.int32(), pa.string())
+        # strings_can_be_null reads blank cells as missing, like pandas and the Excel path do
+        table = pacsv.read_csv(BytesIO(data), convert_options=pacsv.ConvertOptions(column_types={
+            "Region": dimension,
+            "Policy Type": dimension,
+            "Risk Category": dimension,
+        }, strings_can_be_null=True))
+        df = table.to_pandas()
+    else:
+        df = pd.read_excel(BytesIO(data), engine="openpyxl")
+
+    # Leave incomplete files untouched; the uploader reports the missing columns
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        return df
+
+    # Low-cardinality dimensions become categoricals so filters and groupbys work on codes
+    for col in ("Region", "Policy Type", "Risk Category"):
+        values = df[col]
+        if values.dtype == object:
+            # Text mixed with numbers (common in Excel) becomes text so Arrow and Polars can convert it
+            values = values.where(values.isna(), values.astype(str))
+        df[col] = values.astype("category")
+    # Nullable Int32 keeps rows with a blank Year instead of rejecting the whole file
+    df["Year"] = df["Year"].astype("Int32")
+
+    # Narrower numeric dtypes halve the bytes scanned by sums and groupbys
+    for col in ("Loss Amount", "Premium Collected"):
+        df[col] = pd.to_numeric(df[col], downcast="float")
+    df["Claim Count"] = pd.to_numeric(df["Claim Count"], downcast="integer")
+
+    # Columnar snapshot lets later sessions uploading the same bytes skip parsing entirely
+    _write_snapshot(df, snapshot)
+    return df
+
+
+def _filter_mask(df, filters):
+    # One boolean buffer, AND-ed in place column by column over the category codes
+    mask = np.ones(len(df), dtype=bool)
+    for col, selected in filters.items():
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.categories.get_indexer(list(selected))
+            mask &= np.isin(values.cat.codes.to_numpy(), codes[codes >= 0])
+        else:
+            mask &= values.isin(list(selected)).to_numpy(dtype=bool)
+    return mask
+
+
+def _selection_key(selected):
+    # Order-independent cache key; sorting by (type, text) never compares mixed values directly
+    return tuple(sorted(selected, key=lambda v: (type(v).__name__, str(v))))
+
+
+def _sorted_options(values):
+    # Natural order where the values compare; text order for mixed text and numbers
+    try:
+        return sorted(values)
+    except TypeError:
+        return sorted(values, key=str)
+
+
+@st.cache_data(show_spinner=False)
+def filter_domains(_df, df_key):
+    return (
+        _sorted_options(_df["Region"].cat.categories),
+        np.unique(_df["Year"].dropna().to_numpy(dtype="int64")).tolist(),
+        _sorted_options(_df["Policy Type"].cat.categories),
+        # Rows with a missing filter value never match a selection, so they rule out the no-filter shortcut
+        any(_df[col].hasnans for col in ("Region", "Year", "Policy Type")),
+    )
+
+
+# `_df` is skipped by Streamlit's hasher; `filter_key` identifies the filtered frame.
+# Sums run in Float64 like pandas does, so chart totals match the KPI boxes even for
+# float32 columns, and null keys are dropped as pandas' groupby did.
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _polars_frame(_df, filter_key):
+    # Converted once per filter and shared read-only by every aggregation below; only the
+    # chart columns, so unrelated mixed-type columns in the upload can't break the conversion
+    columns = ["Region", "Year", "Policy Type", "Risk Category", "Loss Amount", "Premium Collected"]
+    return pl.from_pandas(_df[columns], rechunk=False)
+
+
+@st.cache_data(show_spinner=False)
+def agg_loss(_df, filter_key, dim):
+    return (
+        _polars_frame(_df, filter_key)
+        .filter(pl.col(dim).is_not_null())
+        .group_by(dim, maintain_order=True)
+        .agg(pl.col("Loss Amount").cast(pl.Float64).sum())
+        .to_pandas()
+    )
+
+
+@st.cache_data(show_spinner=False)
+def agg_margin(_df, filter_key, dim):
+    return (
+        _polars_frame(_df, filter_key)
+        .filter(pl.col(dim).is_not_null())
+        .group_by(dim, maintain_order=True)
+        .agg(pl.col("Premium Collected").cast(pl.Float64).sum(), pl.col("Loss Amount").cast(pl.Float64).sum())
+        .with_columns((pl.col("Premium Collected") - pl.col("Loss Amount")).alias("Underwriting Margin"))
+        .to_pandas()
+    )
+
+
+@st.cache_data(show_spinner=False)
+def grid_options(_df, filter_key):
+    # Paginated grid so the browser only lays out one page of rows at a time
+    builder = GridOptionsBuilder.from_dataframe(_df)
+    builder.configure_pagination(paginationAutoPageSize=False, paginationPageSize=50)
+    # Round-trip through JSON to drop the builder's unpicklable defaultdicts
+    return json.loads(json.dumps(builder.build()))
+
+
 # Welcome screen
 if "file_uploaded" not in st.session_state:
     st.session_state.file_uploaded = False
 
 if not st.session_state.file_uploaded:
     st.title("📊 Reinsurance Portfolio Dashboard")
+    if st.session_state.pop("upload_expired", False):
+        st.warning("⚠️ Your uploaded file is no longer held in memory (it expired or made room for newer uploads). Please upload it again to continue.")
     st.image("welcome.gif", use_container_width=True)
 
     with st.sidebar.expander("📋 Upload Instructions", expanded=True):
@@ -38,16 +247,16 @@ if not st.session_state.file_uploaded:
 
     if uploaded_file:
         try:
-            if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            data = uploaded_file.getvalue()
+            df = _parse_upload(uploaded_file.name, data)
 
             if not all(col in df.columns for col in REQUIRED_COLUMNS):
                 st.error("❌ Uploaded file is missing one or more required columns.")
                 st.stop()
 
-            st.session_state.df = df
+            df_key = _upload_key(data)
+            _shared_frame(df_key, df)
+            st.session_state.df_key = df_key
             st.session_state.file_uploaded = True
             st.rerun()
 
@@ -55,64 +264,107 @@ if not st.session_state.file_uploaded:
             st.error(f"❌ Failed to read file: {e}")
 
 else:
-    df = st.session_state.df
+    try:
+        df = _shared_frame(st.session_state.df_key)
+    except KeyError:
+        # The frame was evicted (or the server restarted); ask for the file again
+        st.session_state.file_uploaded = False
+        st.session_state.upload_expired = True
+        st.rerun()
+
     st.sidebar.success("✅ File uploaded")
 
     theme = st.sidebar.selectbox("🎨 Theme", ["Light", "Dark"])
 
     # Sidebar Filters
     st.sidebar.header("🔍 Filters")
-    region_filter = st.sidebar.multiselect("Region", df["Region"].unique(), default=list(df["Region"].unique()))
-    year_filter = st.sidebar.multiselect("Year", df["Year"].unique(), default=list(df["Year"].unique()))
-    policy_filter = st.sidebar.multiselect("Policy Type", df["Policy Type"].unique(), default=list(df["Policy Type"].unique()))
+    regions, years, policies, has_missing = filter_domains(df, st.session_state.df_key)
+    region_filter = st.sidebar.multiselect("Region", regions, default=regions)
+    year_filter = st.sidebar.multiselect("Year", years, default=years)
+    policy_filter = st.sidebar.multiselect("Policy Type", policies, default=policies)
 
     # Apply filters
-    filtered_df = df[
-        df["Region"].isin(region_filter) &
-        df["Year"].isin(year_filter) &
-        df["Policy Type"].isin(policy_filter)
-    ]
-
-    def format_dollars_short(n):
-        abs_n = abs(n)
-        if abs_n >= 1_000_000_000:
-            return f"${n / 1_000_000_000:.1f}B"
-        elif abs_n >= 1_000_000:
-            return f"${n / 1_000_000:.1f}M"
-        elif abs_n >= 1_000:
-            return f"${n / 1_000:.1f}K"
-        else:
-            return f"${n:,.0f}"
+    if (not has_missing and len(region_filter) == len(regions)
+            and len(year_filter) == len(years) and len(policy_filter) == len(policies)):
+        # Nothing narrowed: skip the mask and share one cache entry for the full view
+        filtered_df = df
+        filter_key = (st.session_state.df_key, "all")
+    else:
+        filtered_df = df[_filter_mask(df, {
+            "Region": region_filter,
+            "Year": year_filter,
+            "Policy Type": policy_filter,
+        })]
+        filter_key = (
+            st.session_state.df_key,
+            _selection_key(region_filter),
+            _selection_key(year_filter),
+            _selection_key(policy_filter),
+        )
 
-    def format_bar_chart(df, x_col, y_col, title, y_axis_label):
-        fig = px.bar(
-            df, x=x_col, y=y_col, color=x_col,
-            text=y_col,
-            color_discrete_sequence=px.colors.qualitative.Vivid
+    def format_dollars_short_vec(values):
+        # Pick each value's B/M/K bucket with np.select instead of branching per value
+        arr = np.asarray(values, dtype="float64")
+        abs_arr = np.abs(arr)
+        idx = np.select(
+            [abs_arr >= 1_000_000_000, abs_arr >= 1_000_000, abs_arr >= 1_000],
+            [0, 1, 2],
+            default=3
         )
+        scaled = arr / np.array([1_000_000_000, 1_000_000, 1_000, 1])[idx]
+        suffix = np.array(["B", "M", "K", ""])[idx]
+        # The unsuffixed bucket is below 1,000, so the only value needing a separator is a rounded 1000
+        whole = np.char.replace(np.char.mod("%.0f", scaled), "1000", "1,000")
+        digits = np.where(idx < 3, np.char.mod("%.1f", scaled), whole)
+        return np.char.add(np.char.add("$", digits), suffix).astype(object)
+
+    def format_bar_chart(df, x_col, y_col, title, y_axis_label):
+        # Build the figure once per session and swap trace data in place on later runs
+        fig = st.session_state.get("bar_fig")
+        if fig is None:
+            fig = px.bar(df, x=x_col, y=y_col, text=y_col)
+            fig.update_traces(
+                marker_line_width=1.5,
+                marker_line_color="black",
+                texttemplate="%{text}",
+                textposition="outside"
+            )
+            fig.update_layout(
+                title_font_size=20,
+                bargap=0.25,
+                height=500,
+                showlegend=False
+            )
+            st.session_state.bar_fig = fig
+
+        palette = px.colors.qualitative.Vivid
         fig.update_traces(
-            marker_line_width=1.5,
-            marker_line_color="black",
-            texttemplate="$%{text:,.0f}",
-            textposition="outside"
+            x=df[x_col].tolist(),
+            y=df[y_col].to_numpy(),
+            text=format_dollars_short_vec(df[y_col].to_numpy()),
+            marker_color=[palette[i % len(palette)] for i in range(len(df))],
+            hovertemplate=f"{x_col}=%{{x}}<br>{y_col}=%{{y}}<extra></extra>"
         )
         fig.update_layout(
             title=title,
             xaxis_title=x_col,
-            yaxis_title=y_axis_label,
-            title_font_size=20,
-            bargap=0.25,
-            height=500,
+            yaxis_title=y_axis_label
+        )
+        return fig
+
+    def apply_theme(fig):
+        # Theme flips only touch layout colours on the existing figure
+        fig.update_layout(
             plot_bgcolor="black" if theme == "Dark" else "white",
             paper_bgcolor="black" if theme == "Dark" else "white",
-            font_color="white" if theme == "Dark" else "black",
-            showlegend=False
+            font_color="white" if theme == "Dark" else "black"
         )
         return fig
 
-    def generate_pdf_report(kpis):
-        temp_file = NamedTemporaryFile(delete=False, suffix=".pdf")
-        c = canvas.Canvas(temp_file.name, pagesize=letter)
+    @st.cache_data(show_spinner=False)
+    def generate_pdf_report(kpi_items: tuple[tuple[str, str], ...]) -> bytes:
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter)
         width, height = letter
 
         c.setFont("Helvetica-Bold", 16)
@@ -120,88 +372,114 @@ else:
 
         c.setFont("Helvetica", 12)
         y = height - 80
-        for label, value in kpis.items():
+        for label, value in kpi_items:
             c.drawString(50, y, f"{label}: {value}")
             y -= 20
 
         c.save()
-        return temp_file.name
+        return buffer.getvalue()
 
     st.markdown("### 📉 Key Metrics")
 
-    total_premium = filtered_df["Premium Collected"].sum()
-    total_loss = filtered_df["Loss Amount"].sum()
-    claim_count = filtered_df["Claim Count"].sum()
+    # One reduction over the three KPI columns; float64 keeps downcast columns from losing precision
+    # and nansum skips blank cells the way Series.sum() does
+    kpi_values = filtered_df[["Premium Collected", "Loss Amount", "Claim Count"]].to_numpy(dtype="float64", na_value=np.nan)
+    total_premium, total_loss, claim_count = np.nansum(kpi_values, axis=0)
     loss_ratio = total_loss / total_premium if total_premium else 0
     avg_severity = total_loss / claim_count if claim_count else 0
     underwriting_margin = total_premium - total_loss
     margin_percent = underwriting_margin / total_premium if total_premium else 0
 
+    premium_text, loss_text, severity_text, margin_text = format_dollars_short_vec(
+        [total_premium, total_loss, avg_severity, underwriting_margin]
+    )
+
     kpis = {
-        "Total Premium": format_dollars_short(total_premium),
-        "Total Loss": format_dollars_short(total_loss),
+        "Total Premium": premium_text,
+        "Total Loss": loss_text,
         "Loss Ratio": f"{loss_ratio:.2%}",
-        "Avg Claim Severity": format_dollars_short(avg_severity),
-        "Underwriting Margin": format_dollars_short(underwriting_margin),
+        "Avg Claim Severity": severity_text,
+        "Underwriting Margin": margin_text,
         "Margin %": f"{margin_percent:.2%}"
     }
 
-    # Colored KPI boxes
-    kpi_cols = st.columns(3)
+    # Colored KPI boxes, three per row, sent as a single markdown element
     kpi_colors = ["#e0f7fa", "#ffe0b2", "#dcedc8", "#f8bbd0", "#c5cae9", "#fff9c4"]
 
-    for (label, value), color, col in zip(kpis.items(), kpi_colors, kpi_cols * 2):
-        col.markdown(f"""
-        <div style='padding: 15px; border-radius: 10px; background-color: {color}; color: black; text-align: center;'>
-            <h4 style='margin-bottom: 5px;'>{label}</h4>
-            <h2 style='margin-top: 0;'>{value}</h2>
-        </div>
-        """, unsafe_allow_html=True)
+    kpi_boxes = "".join(
+        f"<div style='flex: 1 1 calc(33% - 10px); padding: 15px; border-radius: 10px; "
+        f"background-color: {color}; color: black; text-align: center;'>"
+        f"<h4 style='margin-bottom: 5px;'>{label}</h4>"
+        f"<h2 style='margin-top: 0;'>{value}</h2>"
+        f"</div>"
+        for (label, value), color in zip(kpis.items(), kpi_colors)
+    )
+    st.markdown(f"<div style='display: flex; flex-wrap: wrap; gap: 10px;'>{kpi_boxes}</div>", unsafe_allow_html=True)
+
+    # Chart widgets only rerun this fragment, not the whole dashboard
+    @st.fragment
+    def render_visualizations(filtered_df, filter_key):
+        st.markdown("### 📈 Visualizations")
+
+        chart_type = st.selectbox("📊 Select Chart Type", ["Loss by", "Underwriting Margin by"])
+        dimension = st.radio("Group by", ["Region", "Year", "Policy Type"], horizontal=True)
 
-    st.markdown("### 📈 Visualizations")
+        # Rebuild only when the chart's inputs change; otherwise reuse the session's figure
+        chart_key = (chart_type, dimension, filter_key)
+        if st.session_state.get("last_chart_key") != chart_key:
+            if chart_type == "Loss by":
+                group_df = agg_loss(filtered_df, filter_key, dimension)
+                format_bar_chart(group_df, dimension, "Loss Amount", f"Loss by {dimension}", "Loss Amount")
 
-    chart_type = st.selectbox("📊 Select Chart Type", ["Loss by", "Underwriting Margin by"])
-    dimension = st.radio("Group by", ["Region", "Year", "Policy Type"], horizontal=True)
+            elif chart_type == "Underwriting Margin by":
+                group_df = agg_margin(filtered_df, filter_key, dimension)
+                format_bar_chart(group_df, dimension, "Underwriting Margin", f"Margin by {dimension}", "Underwriting Margin")
 
-    if chart_type == "Loss by":
-        group_df = filtered_df.groupby(dimension)["Loss Amount"].sum().reset_index()
-        fig = format_bar_chart(group_df, dimension, "Loss Amount", f"Loss by {dimension}", "Loss Amount")
-        st.plotly_chart(fig, use_container_width=True)
+            st.session_state.last_chart_key = chart_key
+        st.plotly_chart(apply_theme(st.session_state.bar_fig), use_container_width=True)
 
-    elif chart_type == "Underwriting Margin by":
-        group_df = filtered_df.groupby(dimension)[["Premium Collected", "Loss Amount"]].sum().reset_index()
-        group_df["Underwriting Margin"] = group_df["Premium Collected"] - group_df["Loss Amount"]
-        fig = format_bar_chart(group_df, dimension, "Underwriting Margin", f"Margin by {dimension}", "Underwriting Margin")
-        st.plotly_chart(fig, use_container_width=True)
+        st.markdown("### Loss Distribution Pie Chart")
+        pie_group = st.selectbox("Group Loss By", ["Region", "Policy Type", "Risk Category"])
 
-    st.markdown("### Loss Distribution Pie Chart")
-    pie_group = st.selectbox("Group Loss By", ["Region", "Policy Type", "Risk Category"])
-    loss_group = filtered_df.groupby(pie_group)["Loss Amount"].sum().reset_index()
+        pie_key = (pie_group, filter_key)
+        if st.session_state.get("last_pie_key") != pie_key:
+            loss_group = agg_loss(filtered_df, filter_key, pie_group)
 
-    fig_pie = px.pie(loss_group, names=pie_group, values="Loss Amount",
-                     color_discrete_sequence=px.colors.qualitative.Set3,
-                     title=f"Loss Distribution by {pie_group}")
-    fig_pie.update_traces(textinfo="percent+label")
-    st.plotly_chart(fig_pie, use_container_width=True)
+            fig_pie = px.pie(loss_group, names=pie_group, values="Loss Amount",
+                             color_discrete_sequence=px.colors.qualitative.Set3,
+                             title=f"Loss Distribution by {pie_group}")
+            fig_pie.update_traces(textinfo="percent+label")
+            st.session_state.pie_fig = fig_pie
+            st.session_state.last_pie_key = pie_key
+        st.plotly_chart(st.session_state.pie_fig, use_container_width=True)
+
+    render_visualizations(filtered_df, filter_key)
 
     st.markdown("### 📋 Filtered Data Table")
-    st.dataframe(filtered_df)
+    # AgGrid adds its own row-id column to the frame it receives, so hand it a shallow copy
+    AgGrid(
+        filtered_df.copy(deep=False),
+        gridOptions=grid_options(filtered_df, filter_key),
+        # No grid events rerun the script; sorting and filtering stay client-side
+        update_on=[],
+        key="grid-1",
+        enable_enterprise_modules=False
+    )
 
-    def download_filtered_excel(dataframe):
+    def download_filtered_csv(dataframe):
+        # pandas' C writer is far cheaper than xlsxwriter's per-cell serialization
         towrite = BytesIO()
-        with pd.ExcelWriter(towrite, engine='xlsxwriter') as writer:
-            dataframe.to_excel(writer, sheet_name='Filtered Data', index=False)
-            towrite.seek(0)
-            return towrite
+        dataframe.to_csv(towrite, index=False)
+        towrite.seek(0)
+        return towrite
     st.download_button(
-        label="📅 Download Filtered Excel",
-        data=download_filtered_excel(filtered_df),
-        file_name="filtered_data.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        label="📅 Download Filtered CSV",
+        data=download_filtered_csv(filtered_df),
+        file_name="filtered_data.csv",
+        mime="text/csv"
     )
     #st.markdown("✅ This download includes **only the filtered** data shown above.")
     #st.download_button("📅 Download Filtered Excel", convert_df_to_excel(filtered_df), "filtered_data.xlsx", "application/vnd.openxmlformats-  #officedocument.spreadsheetml.sheet")
 
-    pdf_file = generate_pdf_report(kpis)
-    with open(pdf_file, "rb") as f:
-        st.download_button("📄 Download PDF Report", f, file_name="reinsurance_report.pdf", mime="application/pdf")
+    pdf_bytes = generate_pdf_report(tuple(kpis.items()))
+    st.download_button("📄 Download PDF Report", pdf_bytes, file_name="reinsurance_report.pdf", mime="application/pdf")